@@ -1,44 +1,141 @@
-from flask import Flask, request, jsonify
+# 운영 환경 실행:
+#   USE_GEVENT=1 gunicorn -k gevent -w $(nproc) --preload -b 0.0.0.0:5000 REST_API_Health:app
+# gevent 패치는 다른 모듈을 불러오기 전에 적용해야 함
+import os
+if os.environ.get("USE_GEVENT") == "1":
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, abort, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import TypeDecorator, event, func, select, update
+from sqlalchemy.schema import CreateIndex, CreateTable
 from marshmallow import Schema, fields, ValidationError
-from datetime import datetime, timedelta
+from calendar import monthrange
+from datetime import date, timedelta
+import re
+import threading
+import orjson
+
+# orjson 기반 JSON 처리기 (jsonify 및 request.json에서 사용)
+class ORJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# orjson 바이트를 그대로 본문으로 사용하는 JSON 응답
+def ojson(obj, status=200):
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///workouts.db'
+app.json = ORJSONProvider(app)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get("DATABASE_URL", 'sqlite:///workouts.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy(app)
+# 읽기 위주 요청에서 불필요한 autoflush를 끄고,
+# 커밋 후 응답 직렬화 시 속성 재조회(SELECT)가 일어나지 않도록 만료를 비활성화
+db = SQLAlchemy(app, session_options={"autoflush": False, "expire_on_commit": False})
+
+# SQLite 연결마다 WAL 모드 및 성능 관련 PRAGMA 적용
+def _sqlite_pragmas(dbapi_conn, _):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=268435456")
+    cur.close()
+
+with app.app_context():
+    if db.engine.dialect.name == "sqlite":
+        event.listen(db.engine, "connect", _sqlite_pragmas)
+
+# 날짜 형식 (모듈 로드 시 한 번만 컴파일)
+_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})", re.ASCII)
+_MONTH_RE = re.compile(r"(\d{4})-(\d{2})", re.ASCII)
+
+# YYYY-MM-DD 문자열을 date로 변환, 형식이나 값이 잘못되면 None
+def _parse_date(value):
+    m = _DATE_RE.fullmatch(value)
+    if not m:
+        return None
+    y, mo, d = map(int, m.groups())
+    if y < 1 or not 1 <= mo <= 12 or not 1 <= d <= monthrange(y, mo)[1]:
+        return None
+    return date(y, mo, d)
+
+# YYYY-MM 문자열을 해당 월 1일 date로 변환, 형식이나 값이 잘못되면 None
+def _parse_month(value):
+    m = _MONTH_RE.fullmatch(value)
+    if not m:
+        return None
+    y, mo = map(int, m.groups())
+    if y < 1 or not 1 <= mo <= 12 or (y, mo) == (9999, 12):  # 다음 달 1일을 표현할 수 없음
+        return None
+    return date(y, mo, 1)
+
+# 날짜 컬럼 타입: API에서는 YYYY-MM-DD 문자열, DB에는 정수 일련번호(date.toordinal())로 저장
+# 문자열보다 인덱스가 작고 범위 비교가 정수 비교가 됨
+class JDay(TypeDecorator):
+    impl = db.Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else date.fromisoformat(value).toordinal()
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else date.fromordinal(value).isoformat()
 
 # 모델 정의
+# 관계를 추가할 때는 N+1 지연 로딩을 막기 위해 backref 대신
+# relationship(..., lazy="selectin", back_populates=...)로 양쪽을 선언하고,
+# 목록 조회에서는 필요한 관계만 selectinload()로 명시적으로 불러올 것
 class Workout(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     sets = db.Column(db.Integer, nullable=False)
     reps = db.Column(db.Integer, nullable=False)
-    date = db.Column(db.String(10), nullable=False)  # YYYY-MM-DD 형식
+    date = db.Column(JDay, nullable=False)  # YYYY-MM-DD 형식
+
+    # 요약 조회용 커버링 인덱스 (date 선두 컬럼으로 날짜 범위 조회도 처리)
+    __table_args__ = (
+        db.Index('ix_workout_date_name_sets_reps', 'date', 'name', 'sets', 'reps'),
+    )
 
 class Diet(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     calories = db.Column(db.Integer, nullable=False)
-    date = db.Column(db.String(10), nullable=False)  # YYYY-MM-DD 형식
+    date = db.Column(JDay, nullable=False, index=True)  # YYYY-MM-DD 형식
     protein = db.Column(db.Float, nullable=True)
     carbs = db.Column(db.Float, nullable=True)
     fats = db.Column(db.Float, nullable=True)
 
 # 스키마 정의
+def _validate_date(value):
+    if _parse_date(value) is None:
+        raise ValidationError("Invalid date format. Expected format: YYYY-MM-DD")
+
 class WorkoutSchema(Schema):
+    class Meta:
+        render_module = orjson
+
     id = fields.Int(dump_only=True)
     name = fields.Str(required=True)
     sets = fields.Int(required=True)
     reps = fields.Int(required=True)
-    date = fields.Str(required=True)
+    date = fields.Str(required=True, validate=_validate_date)
 
 class DietSchema(Schema):
+    class Meta:
+        render_module = orjson
+
     id = fields.Int(dump_only=True)
     name = fields.Str(required=True)
     calories = fields.Int(required=True)
-    date = fields.Str(required=True)
+    date = fields.Str(required=True, validate=_validate_date)
     protein = fields.Float()
     carbs = fields.Float()
     fats = fields.Float()
@@ -49,6 +146,39 @@ workouts_schema = WorkoutSchema(many=True)
 diet_schema = DietSchema()
 diets_schema = DietSchema(many=True)
 
+# 목록 응답에 사용할 컬럼 (ORM 객체/스키마를 거치지 않고 행을 바로 dict로 변환)
+WORKOUT_COLUMNS = (Workout.id, Workout.name, Workout.sets, Workout.reps, Workout.date)
+DIET_COLUMNS = (
+    Diet.id, Diet.name, Diet.calories, Diet.date, Diet.protein, Diet.carbs, Diet.fats
+)
+
+def _fetch_rows(stmt):
+    return [dict(r) for r in db.session.execute(stmt).mappings()]
+
+# 목록 조회 페이지 크기
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# SQLite INTEGER(64비트 부호 있는 정수) 최댓값
+MAX_SQLITE_INT = 2**63 - 1
+
+# ?cursor=<id>&limit=<n> 파라미터 해석
+# (cursor는 0~MAX_SQLITE_INT, limit은 1~MAX_PAGE_SIZE로 제한)
+def _page_args():
+    cursor = request.args.get('cursor', 0, type=int)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return max(0, min(cursor, MAX_SQLITE_INT)), max(1, min(limit, MAX_PAGE_SIZE))
+
+# id 기준 키셋 페이지네이션 (OFFSET 없이 기본 키 인덱스로 탐색)
+def _keyset_page(columns):
+    cursor, limit = _page_args()
+    id_col = columns[0]
+    items = _fetch_rows(
+        select(*columns).where(id_col > cursor).order_by(id_col).limit(limit)
+    )
+    next_cursor = items[-1]["id"] if len(items) == limit else None
+    return items, next_cursor
+
 # 라우트 정의
 @app.route("/")
 def home():
@@ -58,51 +188,115 @@ def home():
 @app.route("/workouts", methods=["POST"])
 def add_workout():
     try:
-        data = workout_schema.load(request.json)  # 요청 데이터를 검증 및 로드
+        data = workout_schema.loads(request.get_data(cache=False))  # 요청 데이터를 검증 및 로드
         workout = Workout(**data)  # Workout 객체 생성
         db.session.add(workout)
         db.session.commit()
         return jsonify(workout_schema.dump(workout)), 201  # JSON 응답
     except ValidationError as err:
         return jsonify(err.messages), 400  # 유효성 검사 오류 처리
+    except orjson.JSONDecodeError:
+        return jsonify({"error": "Invalid JSON body"}), 400
+
+# 운동 기록 일괄 추가 (단일 트랜잭션, executemany)
+@app.route("/workouts/bulk", methods=["POST"])
+def add_workouts_bulk():
+    try:
+        data = workouts_schema.loads(request.get_data(cache=False))
+        db.session.bulk_insert_mappings(Workout, data)
+        db.session.commit()
+        return jsonify({"inserted": len(data)}), 201
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    except orjson.JSONDecodeError:
+        return jsonify({"error": "Invalid JSON body"}), 400
+
+# 가장 최근 운동 기록 id (기본 키 인덱스 끝만 읽는 SEARCH)
+# 운동 기록은 추가만 가능하고 삭제가 없어 id가 재사용되지 않으므로,
+# 최대 id가 같으면 테이블 내용도 같음 (행 수는 별도로 볼 필요 없음)
+def _latest_workout_id():
+    return db.session.execute(select(func.max(Workout.id))).scalar() or 0
+
+# 운동 기록 ETag
+def _workouts_etag():
+    return str(_latest_workout_id())
 
 # 운동 기록 조회
 @app.route("/workouts", methods=["GET"])
 def get_workouts():
     date = request.args.get('date')
-    if date:
-        workouts = Workout.query.filter_by(date=date).all()
+    if date and _parse_date(date) is None:
+        return jsonify({"error": "Invalid date format. Expected format: YYYY-MM-DD"}), 400
+
+    # 변경이 없으면 본문 없이 304 응답
+    etag = _workouts_etag()
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    elif date:
+        resp = ojson(_fetch_rows(select(*WORKOUT_COLUMNS).where(Workout.date == date)))
     else:
-        workouts = Workout.query.all()
-    return jsonify(workouts_schema.dump(workouts)), 200
+        workouts, next_cursor = _keyset_page(WORKOUT_COLUMNS)
+        resp = ojson({"items": workouts, "next_cursor": next_cursor})
+    resp.set_etag(etag, weak=True)
+    return resp
+
+# 조건에 맞는 운동 기록의 (총 세트, 총 반복, 운동 종류 수)를 SQL에서 집계
+def _workout_totals(*criteria):
+    return db.session.query(
+        func.coalesce(func.sum(Workout.sets), 0),
+        func.coalesce(func.sum(Workout.reps), 0),
+        func.count(func.distinct(Workout.name))
+    ).filter(*criteria).one()
+
+# 요약 응답 캐시: 키 -> (계산 시점의 최대 운동 기록 id, 응답 본문 바이트)
+# 최대 id가 그대로면 그 사이 추가된 기록이 없으므로 (_latest_workout_id 참고)
+# 범위 집계를 다시 하지 않고 기본 키 조회 한 번으로 캐시 유효성을 확인.
+# dict 삽입 순서를 사용 순서로 유지하는 LRU이며, 스레드 워커에서 함께 쓰므로 잠금으로 보호
+_summary_cache = {}
+_summary_cache_lock = threading.Lock()
+SUMMARY_CACHE_SIZE = 1024
+
+def _cached_summary(key, criteria, extra):
+    latest_id = _latest_workout_id()
+    with _summary_cache_lock:
+        cached = _summary_cache.pop(key, None)
+        if cached is not None and cached[0] == latest_id:
+            _summary_cache[key] = cached  # 가장 최근 사용으로 이동
+            return Response(cached[1], mimetype="application/json")
+
+    total_sets, total_reps, unique_exercises = _workout_totals(*criteria)
+    body = orjson.dumps({
+        "total_sets": total_sets,
+        "total_reps": total_reps,
+        "unique_exercises": unique_exercises,
+        **extra
+    })
+    with _summary_cache_lock:
+        _summary_cache.pop(key, None)
+        if len(_summary_cache) >= SUMMARY_CACHE_SIZE:
+            _summary_cache.pop(next(iter(_summary_cache)))  # 가장 오래 사용하지 않은 항목 제거
+        _summary_cache[key] = (latest_id, body)
+    return Response(body, mimetype="application/json")
 
 @app.route("/workouts/summary/weekly", methods=["GET"])
 def weekly_summary():
     start_date = request.args.get('start_date')
     if not start_date:
         return jsonify({"error": "start_date is required"}), 400
-    try:
-        # 문자열을 datetime 객체로 변환
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = start + timedelta(days=6)
-
-        # DB에서 주간 데이터를 가져오기
-        workouts = Workout.query.filter(Workout.date.between(
-            start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
-        )).all()
-        total_sets = sum(w.sets for w in workouts)
-        total_reps = sum(w.reps for w in workouts)
-        unique_exercises = len(set(w.name for w in workouts))
-
-        return jsonify({
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-            "unique_exercises": unique_exercises,
-            "start_date": start.strftime("%Y-%m-%d"),
-            "end_date": end.strftime("%Y-%m-%d")
-        }), 200
-    except ValueError as e:
+    start = _parse_date(start_date)
+    if start is None or start > date.max - timedelta(days=6):
         return jsonify({"error": "Invalid start_date format. Expected format: YYYY-MM-DD"}), 400
+    end = start + timedelta(days=6)
+
+    start_str = start.isoformat()
+    end_str = end.isoformat()
+
+    # DB에서 주간 합계를 집계 (변경이 없으면 캐시된 응답 사용)
+    return _cached_summary(
+        ("weekly", start_str),
+        (Workout.date.between(start_str, end_str),),
+        {"start_date": start_str, "end_date": end_str}
+    )
 
 
 @app.route("/workouts/summary/monthly", methods=["GET"])
@@ -110,63 +304,66 @@ def monthly_summary():
     month = request.args.get('month')
     if not month:
         return jsonify({"error": "month is required"}), 400
-    try:
-        # YYYY-MM 형식 확인
-        datetime.strptime(month, "%Y-%m")  # 유효성 검사
-        workouts = Workout.query.filter(Workout.date.like(f"{month}-%")).all()
-
-        total_sets = sum(w.sets for w in workouts)
-        total_reps = sum(w.reps for w in workouts)
-        unique_exercises = len(set(w.name for w in workouts))
-
-        return jsonify({
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-            "unique_exercises": unique_exercises,
-            "month": month
-        }), 200
-    except ValueError:
+    # YYYY-MM 형식 확인
+    parsed = _parse_month(month)
+    if parsed is None:
         return jsonify({"error": "Invalid month format. Expected format: YYYY-MM"}), 400
+    # [해당 월 1일, 다음 달 1일) 범위 조회로 인덱스 범위 스캔 사용
+    start = parsed.isoformat()
+    end = (parsed.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return _cached_summary(
+        ("monthly", month),
+        (Workout.date >= start, Workout.date < end.isoformat()),
+        {"month": month}
+    )
 
 
 # 식단 추가
 @app.route("/diets", methods=["POST"])
 def add_diet():
     try:
-        data = diet_schema.load(request.json)
+        data = diet_schema.loads(request.get_data(cache=False))
         diet = Diet(**data)
         db.session.add(diet)
         db.session.commit()
         return jsonify(diet_schema.dump(diet)), 201
     except ValidationError as err:
         return jsonify(err.messages), 400
+    except orjson.JSONDecodeError:
+        return jsonify({"error": "Invalid JSON body"}), 400
 
 # 식단 조회
 @app.route("/diets", methods=["GET"])
 def get_diets():
     date = request.args.get('date')
     if date:
-        diets = Diet.query.filter_by(date=date).all()
+        if _parse_date(date) is None:
+            return jsonify({"error": "Invalid date format. Expected format: YYYY-MM-DD"}), 400
+        resp = ojson(_fetch_rows(select(*DIET_COLUMNS).where(Diet.date == date)))
     else:
-        diets = Diet.query.all()
-    return jsonify(diets_schema.dump(diets)), 200
+        diets, next_cursor = _keyset_page(DIET_COLUMNS)
+        resp = ojson({"items": diets, "next_cursor": next_cursor})
+    # 식단은 수정/삭제가 가능해 (행 수, 최대 id)로 변경 여부를 알 수 없으므로 본문 해시로 ETag 생성
+    resp.add_etag()
+    return resp.make_conditional(request)
 
 # 식단 수정
 @app.route("/diets/<int:id>", methods=["PUT"])
 def update_diet(id):
-    diet = Diet.query.get_or_404(id)
     try:
-        data = diet_schema.load(request.json)
-        diet.name = data['name']
-        diet.calories = data['calories']
-        diet.date = data['date']
-        diet.protein = data.get('protein')
-        diet.carbs = data.get('carbs')
-        diet.fats = data.get('fats')
+        data = diet_schema.loads(request.get_data(cache=False))
+        # 전체 교체이므로 생략된 영양 성분은 None으로 덮어씀
+        values = {"protein": None, "carbs": None, "fats": None, **data}
+        # 기존 행 조회 없이 단일 UPDATE 실행
+        result = db.session.execute(update(Diet).where(Diet.id == id).values(**values))
+        if result.rowcount == 0:
+            abort(404)
         db.session.commit()
-        return jsonify(diet_schema.dump(diet)), 200
+        return jsonify(diet_schema.dump({"id": id, **values})), 200
     except ValidationError as err:
         return jsonify(err.messages), 400
+    except orjson.JSONDecodeError:
+        return jsonify({"error": "Invalid JSON body"}), 400
 
 # 식단 삭제
 @app.route("/diets/<int:id>", methods=["DELETE"])
@@ -176,8 +373,78 @@ def delete_diet(id):
     db.session.commit()
     return jsonify({"message": f"Diet {id} deleted"}), 200
 
-# 애플리케이션 실행
+# 이전 버전의 DB는 date를 'YYYY-MM-DD' 텍스트로 저장하므로 정수 일련번호 컬럼으로 변환.
+# julianday는 '2024-02-30' 같은 날짜를 다음 달로 넘겨 버리므로 date(julianday(date)) = date로
+# 실제 존재하는 날짜만 허용하고, date.fromordinal 범위(1~date.max) 밖이면 NULL로 둠
+_DATE_TO_ORDINAL_SQL = (
+    "CASE"
+    " WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+    " AND date(julianday(date)) = date"
+    f" AND julianday(date) - 1721424.5 BETWEEN 1 AND {date.max.toordinal()}"
+    " THEN CAST(julianday(date) - 1721424.5 AS INTEGER)"
+    " END"
+)
+
+def _migrate_text_dates(engine):
+    pooled = engine.raw_connection()
+    raw = pooled.driver_connection
+    try:
+        pending = []
+        for model in (Workout, Diet):
+            table = model.__tablename__
+            info = {row[1]: row[2] for row in raw.execute(f"PRAGMA table_info({table})")}
+            if not info or info["date"].upper() == "INTEGER":
+                continue
+
+            # 변환할 수 없는 값이 있으면 잘못된 요약을 제공하지 않도록 어떤 테이블도 바꾸기 전에 시작을 중단
+            bad = raw.execute(
+                f"SELECT count(*) FROM {table} WHERE ({_DATE_TO_ORDINAL_SQL}) IS NULL"
+            ).fetchone()[0]
+            if bad:
+                raise RuntimeError(
+                    f"{table}.date has {bad} row(s) that are not YYYY-MM-DD; "
+                    "fix or remove them before starting the server"
+                )
+            pending.append(model)
+
+        for model in pending:
+            table = model.__tablename__
+            # 테이블을 새 스키마로 다시 만들고 값을 변환해 복사 (단일 트랜잭션)
+            old_indexes = [
+                row[1] for row in raw.execute(f"PRAGMA index_list({table})")
+                if not row[1].startswith("sqlite_autoindex")
+            ]
+            columns = ", ".join(c.name for c in model.__table__.columns)
+            converted = ", ".join(
+                _DATE_TO_ORDINAL_SQL if c.name == "date" else c.name
+                for c in model.__table__.columns
+            )
+            ddl = [str(CreateTable(model.__table__).compile(engine)).strip()]
+            ddl += [str(CreateIndex(i).compile(engine)) for i in model.__table__.indexes]
+            raw.executescript(
+                "BEGIN;"
+                f"ALTER TABLE {table} RENAME TO _{table}_old;"
+                + "".join(f"DROP INDEX {name};" for name in old_indexes)
+                + "".join(f"{stmt};" for stmt in ddl)
+                + f"INSERT INTO {table} ({columns}) SELECT {converted} FROM _{table}_old;"
+                f"DROP TABLE _{table}_old;"
+                "COMMIT;"
+            )
+    except Exception:
+        if raw.in_transaction:
+            raw.rollback()
+        raise
+    finally:
+        pooled.close()
+
+# 테이블 생성 (WSGI 서버에서 불러올 때도 실행되도록 모듈 로드 시 수행)
+with app.app_context():
+    if db.engine.dialect.name == "sqlite":
+        _migrate_text_dates(db.engine)
+    db.create_all()
+    # --preload로 fork된 워커가 부모의 SQLite 연결을 공유하지 않도록 정리
+    db.engine.dispose()
+
+# 개발 서버 실행
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# 테스트 중 모듈을 불러올 때 작업 디렉터리의 workouts.db를 건드리지 않도록 임시 DB 사용
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
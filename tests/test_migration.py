@@ -0,0 +1,108 @@
+import sqlite3
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+
+from REST_API_Health import _migrate_text_dates
+
+# 날짜를 텍스트로 저장하던 이전 버전의 스키마
+BASELINE_SCHEMA = """
+CREATE TABLE workout (
+    id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    date VARCHAR(10) NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE diet (
+    id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    calories INTEGER NOT NULL,
+    date VARCHAR(10) NOT NULL,
+    protein FLOAT,
+    carbs FLOAT,
+    fats FLOAT,
+    PRIMARY KEY (id)
+);
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO workout (id, name, sets, reps, date) VALUES (?, ?, ?, ?, ?)",
+        [(3, "squat", 3, 10, "2024-01-02"), (7, "bench", 4, 8, "2024-02-29")],
+    )
+    conn.execute(
+        "INSERT INTO diet (id, name, calories, date, protein) VALUES (5, 'rice', 300, '2024-01-02', 5.0)"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def migrate(path):
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        _migrate_text_dates(engine)
+    finally:
+        engine.dispose()
+
+
+def snapshot(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            "schema": conn.execute("SELECT name, sql FROM sqlite_master ORDER BY name").fetchall(),
+            "workout": conn.execute("SELECT *, typeof(date) FROM workout ORDER BY id").fetchall(),
+            "diet": conn.execute("SELECT *, typeof(date) FROM diet ORDER BY id").fetchall(),
+        }
+    finally:
+        conn.close()
+
+
+def test_valid_dates_migrate_keeping_ids_and_indexes(db_path):
+    migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    for table in ("workout", "diet"):
+        types = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+        assert types["date"] == "INTEGER"
+    assert conn.execute("SELECT id, name, date FROM workout ORDER BY id").fetchall() == [
+        (3, "squat", date(2024, 1, 2).toordinal()),
+        (7, "bench", date(2024, 2, 29).toordinal()),
+    ]
+    assert conn.execute("SELECT id, name, calories, date, protein FROM diet").fetchall() == [
+        (5, "rice", 300, date(2024, 1, 2).toordinal(), 5.0),
+    ]
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(workout)")}
+    indexes |= {row[1] for row in conn.execute("PRAGMA index_list(diet)")}
+    assert {"ix_workout_date_name_sets_reps", "ix_diet_date"} <= indexes
+    conn.close()
+
+
+def test_second_start_is_a_noop(db_path):
+    migrate(db_path)
+    before = snapshot(db_path)
+    migrate(db_path)
+    assert snapshot(db_path) == before
+
+
+@pytest.mark.parametrize("value", ["2024-02-30", "2023-02-29", "0000-01-01", "20240105", "yesterday"])
+def test_unconvertible_dates_abort_without_changes(db_path, value):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO diet (name, calories, date) VALUES ('bad', 1, ?)", (value,))
+    conn.commit()
+    conn.close()
+    before = snapshot(db_path)
+
+    with pytest.raises(RuntimeError, match="diet.date"):
+        migrate(db_path)
+
+    # 검사는 어떤 테이블도 바꾸기 전에 수행되므로 workout도 그대로 남아 있어야 함
+    assert snapshot(db_path) == before